@@ -5,31 +5,504 @@ GIT Auto Push Script
 """
 
 import os
+import re
 import sys
+import time
 import subprocess
-import datetime
 import argparse
 from pathlib import Path
-import json
-import webbrowser
-import urllib.parse
 import platform
 import logging
+import logging.handlers
+import functools
+import shutil
+import tempfile
+import queue
+import atexit
+import concurrent.futures
+
+try:
+    import psutil
+except ImportError:  # psutil が無い環境ではOSのコマンドでプロセスを確認する
+    psutil = None
+
+# ソースファイルと判定する拡張子
+_SOURCE_EXTENSIONS = frozenset(
+    {
+        ".py",
+        ".js",
+        ".ts",
+        ".java",
+        ".cpp",
+        ".c",
+        ".cs",
+        ".php",
+        ".rb",
+        ".go",
+        ".rs",
+        ".swift",
+        ".kt",
+        ".scala",
+        ".sh",
+        ".bat",
+        ".html",
+        ".css",
+        ".vue",
+        ".jsx",
+        ".tsx",
+        ".json",
+        ".xml",
+        ".yaml",
+        ".yml",
+        ".md",
+        ".txt",
+        ".sql",
+        ".r",
+        ".m",
+        ".pl",
+    }
+)
+
+# プロジェクトの設定ファイル
+_CONFIG_FILES = frozenset(
+    {
+        "package.json",
+        "requirements.txt",
+        "Cargo.toml",
+        "pom.xml",
+        "build.gradle",
+        "Makefile",
+        "CMakeLists.txt",
+        "setup.py",
+        "pyproject.toml",
+        "composer.json",
+        "Gemfile",
+        "go.mod",
+    }
+)
+
+# 一般的なソースディレクトリ
+_SOURCE_DIRS = frozenset({"src", "lib", "app", "components", "modules"})
+
+# Windows システムフォルダ
+_WINDOWS_SYSTEM_PATHS = (
+    "c:\\windows",
+    "c:\\program files",
+    "c:\\program files (x86)",
+    "c:\\programdata",
+    "c:\\users\\public",
+    "c:\\system volume information",
+    "\\appdata\\",
+    "\\temp\\",
+    "\\tmp\\",
+)
+
+# Unix系 システムフォルダ
+_UNIX_SYSTEM_PATHS = (
+    "/bin",
+    "/sbin",
+    "/usr/bin",
+    "/usr/sbin",
+    "/etc",
+    "/var",
+    "/tmp",
+    "/sys",
+    "/proc",
+    "/dev",
+    "/boot",
+    "/root",
+)
+
+# 部分一致の判定を1回の正規表現検索で行う（小文字化したパスに適用）
+_WINDOWS_SYSTEM_PATH_RE = re.compile("|".join(map(re.escape, _WINDOWS_SYSTEM_PATHS)))
+_UNIX_SYSTEM_PATH_RE = re.compile("|".join(map(re.escape, _UNIX_SYSTEM_PATHS)))
+
+
+# .git直下のロックファイル
+_GIT_LOCK_FILES = ("index.lock", "HEAD.lock", "config.lock")
+
+# これより新しいロックファイルは実行中のgitが保持しているとみなす（秒）
+_STALE_LOCK_SECONDS = 60
+
+# ロックファイルを探すrefs配下のディレクトリ
+_GIT_LOCK_REF_DIRS = ("refs/heads", "refs/remotes")
+
+# 変更ファイル一覧で表示する最大行数
+_MAX_STATUS_LINES = 200
+
+# git設定より優先される作成者・コミッターの環境変数
+_GIT_IDENTITY_ENV_VARS = (
+    "GIT_AUTHOR_NAME",
+    "GIT_AUTHOR_EMAIL",
+    "GIT_COMMITTER_NAME",
+    "GIT_COMMITTER_EMAIL",
+)
+
+# confirm_action で受け付ける回答
+_CONFIRM_ANSWERS = {
+    "y": True,
+    "yes": True,
+    "はい": True,
+    "n": False,
+    "no": False,
+    "いいえ": False,
+}
+
+# 実行結果サマリーに表示する項目（execution_results のキーと表示名）
+_SUMMARY_STEPS = (
+    ("git_init", "Git初期化"),
+    ("branch_sync", "ブランチ同期"),
+    ("staging", "ステージング"),
+    ("commit", "コミット"),
+    ("push", "プッシュ"),
+    ("browser_open", "ブラウザ確認"),
+)
+
+# user.name / user.email が未設定の場合に使う既定値
+_DEFAULT_GIT_IDENTITY = (
+    ("user.name", "Auto Committer"),
+    ("user.email", "autocommit@example.com"),
+)
+
+# 1回の git config --get-regexp でまとめて読む設定キー
+_GIT_CONFIG_PATTERN = r"^(user\.(name|email)|remote\.origin\.url)$"
+
+# GitHub のリモートURL（https / ssh / scp形式）から "owner/repo" を取り出す
+_GITHUB_REMOTE_RE = re.compile(
+    r"^(?:https://(?:[^@/]+@)?|ssh://git@|git@)github\.com[:/](.+?)(?:\.git)?/?$"
+)
+
+
+def _iter_lock_files(root):
+    """root配下の .lock ファイルのパスを列挙（os.scandirで再帰的に走査）"""
+    try:
+        with os.scandir(root) as entries:
+            # DirEntry の種別判定はディレクトリ読み込み時の情報を使い、statしない
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_lock_files(entry.path)
+                elif entry.name.endswith(".lock"):
+                    yield entry.path
+    except OSError:
+        return  # ディレクトリが存在しない、または走査中に削除された
+
+
+def _is_git_process_name(name):
+    """実行ファイル名が git 本体か git-remote-https などのヘルパーかを判定"""
+    name = name.lower()
+    if name.endswith(".exe"):
+        name = name[:-4]
+    # git-auto-push.py 自身（Linuxのプロセス名は "git-auto-push.p"）は拡張子付きのため除く
+    return name == "git" or (name.startswith("git-") and "." not in name)
+
+
+# 実行環境・ツールの有無はプロセス実行中に変化しないため、結果をキャッシュする
+@functools.lru_cache(maxsize=None)
+def _which(name):
+    """実行ファイルのパスを検索（結果はキャッシュ）"""
+    return shutil.which(name)
+
+
+@functools.lru_cache(maxsize=1)
+def _is_wsl():
+    """/proc/version からWSL上かどうかを判定（結果はキャッシュ）"""
+    try:
+        with open("/proc/version", "rb", buffering=0) as f:
+            version_info = f.read().lower()
+    except OSError:
+        return False
+    return b"microsoft" in version_info or b"wsl" in version_info
+
+
+@functools.lru_cache(maxsize=1)
+def _detect_platform():
+    """実行環境を検出（結果はキャッシュ）"""
+    system = platform.system().lower()
+    machine = platform.machine()
+    python_version = platform.python_version()
+
+    platform_info = {
+        "system": system,
+        "machine": machine,
+        "python_version": python_version,
+        "type": "unknown",
+        "name": "Unknown",
+        "shell": "unknown",
+        "home_dir": str(Path.home()),
+        "is_windows": False,
+        "is_macos": False,
+        "is_linux": False,
+        "is_wsl": False,
+    }
+
+    # Windows環境の検出
+    if system == "windows":
+        platform_info.update(
+            {
+                "type": "windows",
+                "name": f"Windows {platform.release()}",
+                "shell": "cmd",
+                "is_windows": True,
+            }
+        )
+
+        # PowerShellの検出（プロセスを起動せずPATHから探す）
+        if _which("pwsh"):
+            platform_info["shell"] = "pwsh"
+        elif _which("powershell"):
+            platform_info["shell"] = "powershell"
+
+    # macOS環境の検出
+    elif system == "darwin":
+        platform_info.update(
+            {
+                "type": "macos",
+                "name": f"macOS {platform.mac_ver()[0]}",
+                "shell": "zsh",
+                "is_macos": True,
+            }
+        )
+
+    # Linux環境の検出
+    elif system == "linux":
+        platform_info.update(
+            {
+                "type": "linux",
+                "name": f"Linux {platform.release()}",
+                "shell": "bash",
+                "is_linux": True,
+            }
+        )
+
+        # WSL環境の検出
+        if _is_wsl():
+            platform_info.update(
+                {
+                    "type": "wsl",
+                    "name": f"WSL {platform.release()}",
+                    "is_wsl": True,
+                }
+            )
+
+    return platform_info
+
+
+@functools.lru_cache(maxsize=1)
+def _github_auth_ok():
+    """GitHub CLI の認証状態を取得（結果はキャッシュ）"""
+    result = subprocess.run(["gh", "auth", "status"], capture_output=True)
+    return result.returncode == 0
+
+
+def _gh_config_dir():
+    """GitHub CLI の設定ディレクトリを返す（gh と同じ優先順位）"""
+    if os.environ.get("GH_CONFIG_DIR"):
+        return Path(os.environ["GH_CONFIG_DIR"])
+    if os.environ.get("XDG_CONFIG_HOME"):
+        return Path(os.environ["XDG_CONFIG_HOME"]) / "gh"
+    if sys.platform == "win32" and os.environ.get("AppData"):
+        return Path(os.environ["AppData"]) / "GitHub CLI"
+    return Path.home() / ".config" / "gh"
+
+
+def _read_gh_hosts_user(host="github.com"):
+    """gh の hosts.yml からログイン中のユーザー名を読む（YAMLライブラリは使わない）"""
+    try:
+        with open(_gh_config_dir() / "hosts.yml", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    in_host = False
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        if not line[0].isspace():
+            # トップレベルのキーはホスト名
+            in_host = line.rstrip().rstrip(":").strip("'\"") == host
+        elif in_host:
+            # ホスト直下の "user: <name>" のみを対象にする（users: 配下は除外）
+            indent = len(line) - len(line.lstrip())
+            key, _, value = line.strip().partition(":")
+            if key == "user" and value.strip() and indent <= 4:
+                return value.strip().strip("'\"")
+    return None
+
+
+def _github_api_get(path):
+    """GH_TOKEN / GITHUB_TOKEN があれば GitHub API に直接GETし、(ステータス, 本文) を返す"""
+    token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+    if not token:
+        return None
+
+    # トークンがある場合しか使わないため、ここでインポートする
+    import urllib.error
+    import urllib.request
+
+    request = urllib.request.Request(
+        f"https://api.github.com/{path}",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+        },
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, b""
+    except OSError:
+        return None  # 接続できない場合は gh にまかせる
+
+
+@functools.lru_cache(maxsize=1)
+def _github_username():
+    """GitHub ユーザー名を取得（結果はキャッシュ）"""
+    # gh の設定ファイルや git config から読めればプロセスを起動しない
+    username = _read_gh_hosts_user()
+    if username:
+        return username
+
+    # プロセス内でキャッシュするため、カレントディレクトリに左右されない global 設定だけを読む
+    result = subprocess.run(
+        ["git", "config", "--global", "--get", "github.user"], capture_output=True
+    )
+    username = result.stdout.decode("utf-8", errors="ignore").strip()
+    if result.returncode == 0 and username:
+        return username
+
+    # トークンが環境変数にあれば gh を起動せずにAPIへ直接問い合わせる
+    response = _github_api_get("user")
+    if response and response[0] == 200:
+        import json
+
+        try:
+            username = json.loads(response[1]).get("login")
+        except ValueError:
+            username = None
+        if username:
+            return username
+
+    # --jq でgh側に login だけを抽出させ、Python側でのJSONパースを省く
+    # ログイン名はほぼ変わらないため、gh自身のキャッシュで2回目以降の通信を省く
+    result = subprocess.run(
+        ["gh", "api", "--cache", "1h", "user", "--jq", ".login"], capture_output=True
+    )
+    if result.returncode != 0:
+        return None
+    return result.stdout.decode("utf-8", errors="ignore").strip() or None
+
+
+def _github_web_url(remote_url):
+    """origin のURLから GitHub のリポジトリページのURLを作る（GitHub以外は None）"""
+    match = _GITHUB_REMOTE_RE.match(remote_url or "")
+    if match:
+        return f"https://github.com/{match.group(1)}"
+    return None
+
+
+def _open_browser(url):
+    """URLをブラウザで開き、成功したかを返す"""
+    # webbrowser は読み込みに時間がかかるため、ブラウザを開くときだけインポートする
+    import webbrowser
+
+    try:
+        if webbrowser.open(url):
+            return True
+        print("❌ ブラウザでの表示に失敗しました: 起動できるブラウザがありません")
+    except Exception as e:
+        print(f"❌ ブラウザでの表示に失敗しました: {e}")
+    print(f"🔗 手動で以下のURLにアクセスしてください: {url}")
+    return False
+
+
+class _BufferedFileHandler(logging.FileHandler):
+    """レコードごとのflushを行わないFileHandler（終了時のcloseでまとめて書き出す）"""
+
+    def emit(self, record):
+        super().emit(record)
+        # 異常終了でcloseが呼ばれなくても失敗の記録は残るよう、ERROR以上はすぐ書き出す
+        if record.levelno >= logging.ERROR:
+            super().flush()
+
+    def flush(self):
+        pass
+
+
+class _LogFormatter(logging.Formatter):
+    """日時文字列を秒単位でキャッシュするFormatter（同じ秒内のstrftimeを省く）"""
+
+    # キャッシュはロックなしで更新するため、ハンドラごとに別のインスタンスを使う
+    _cached_second = None
+    _cached_time = ""
+
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        if second != self._cached_second:
+            self._cached_time = time.strftime(
+                datefmt or self.default_time_format, self.converter(second)
+            )
+            self._cached_second = second
+        if datefmt:
+            return self._cached_time
+        # ミリ秒は datefmt の指定がない場合のみ付ける（logging.Formatter と同じ）
+        return self.default_msec_format % (self._cached_time, record.msecs)
 
 
 class GitAutoPush:
-    def __init__(self, repo_path=".", debug=False, log_file=None):
-        self.repo_path = Path(repo_path).resolve()
+    # ログハンドラはプロセス内で一度だけ設定する（複数インスタンスでの重複出力を防ぐ）
+    _log_configured = False
+    _log_file = None
+    _log_listener = None
+
+    def __init__(
+        self,
+        repo_path=".",
+        debug=False,
+        log_file=None,
+        assume_yes=False,
+        no_push=False,
+        force_unlock=False,
+        visibility=None,
+        description=None,
+    ):
+        # resolve() はパスの各要素でシンボリックリンクを辿るため、abspath で絶対パス化のみ行う
+        self.repo_path = Path(os.path.abspath(repo_path))
         self.git_path = self.repo_path / ".git"
+        # subprocess に渡すパスは文字列に変換しておき、呼び出しごとの変換を省く
+        self._cwd = os.fspath(self.repo_path)
+        # 読み取り専用のgit呼び出し用の環境変数（status 等が index.lock を取らない）
+        self._read_only_env = {**os.environ, "GIT_OPTIONAL_LOCKS": "0"}
+        self._git_path_str = os.fspath(self.git_path)
         self.debug = debug
+        self.assume_yes = assume_yes  # 確認を入力待ちせずに自動応答する
+        self.no_push = no_push
+        self.force_unlock = force_unlock  # 古いロックファイルを確認なしで削除する
+        # GitHubリポジトリ作成時の可視性・説明（指定があれば入力を求めない）
+        self.visibility = visibility
+        self.description = description
         self.last_error = None
 
+        # 読み取り専用のgit問い合わせ結果（書き込み系の操作で破棄）
+        self._branches = None
+        self._nested = None
+        self._head_branch = None
+        self._is_git_repo = None
+        self._snapshot = None
+        # git設定はリモート作成時以外は変更しないため、キャッシュ破棄の対象外
+        self._git_config = None
+        self._identity_args = None
+        self._github_auth_future = None
+        self._confirm_all = False  # 以降の確認をまとめて承認済み
+        # ブランチごとの upstream（設定を変えるのは push -u だけなので破棄しない）
+        self._upstreams = {}
+
         # ログ設定
         self.setup_logging(log_file)
 
-        # 実行環境の検出
+        # 実行環境の検出（gh の有無はGitHubを使う処理で初めて確認する）
         self.platform_info = self.detect_platform()
-        self.github_cli_available = self.check_github_cli()
+        self._github_cli_available = None
 
         # プラットフォーム情報をデバッグ出力
         platform_name = self.platform_info["name"]
@@ -40,9 +513,14 @@ class GitAutoPush:
 
     def setup_logging(self, log_file=None):
         """ログ設定を初期化"""
+        if GitAutoPush._log_configured:
+            self.log_file = GitAutoPush._log_file
+            self.logger = logging.getLogger(__name__)
+            return
+
         if log_file is None:
             # デフォルトのログファイル名（タイムスタンプ付き）
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
             log_file = f"git-auto-push_{timestamp}.log"
 
         self.log_file = Path(log_file)
@@ -50,19 +528,51 @@ class GitAutoPush:
         # ログフォーマットの設定
         log_format = "%(asctime)s - %(levelname)s - %(message)s"
 
+        # ファイルへの書き込みはバックグラウンドスレッドで行い、呼び出し側をブロックしない
+        # delay=True で最初の書き込みまでファイルを開かない
+        file_handler = _BufferedFileHandler(self.log_file, encoding="utf-8", delay=True)
+        # ファイル側はリスナースレッドで整形するため、コンソール側とFormatterを共有しない
+        file_handler.setFormatter(_LogFormatter(log_format))
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            log_queue, file_handler, respect_handler_level=True
+        )
+        listener.start()
+        GitAutoPush._log_listener = listener
+        atexit.register(GitAutoPush.stop_logging)  # 終了時に残りのログを書き出す
+
+        # 整形はファイル側のハンドラで行うため、キューにはメッセージのみを渡す
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(_LogFormatter(log_format))
+
         # ログ設定
         logging.basicConfig(
             level=logging.INFO,
-            format=log_format,
             handlers=[
-                logging.FileHandler(self.log_file, encoding="utf-8"),
-                logging.StreamHandler(),  # コンソールにも出力
+                queue_handler,
+                # コンソールは print() との表示順を保つため同期出力のまま
+                stream_handler,
             ],
         )
 
+        GitAutoPush._log_configured = True
+        GitAutoPush._log_file = self.log_file
+
         self.logger = logging.getLogger(__name__)
         self.logger.info(f"🚀 Git Auto Push ログ開始 - ログファイル: {self.log_file}")
 
+    @classmethod
+    def stop_logging(cls):
+        """ログの書き込みスレッドを止め、バッファ中のログをファイルに書き出す"""
+        listener, cls._log_listener = cls._log_listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
     def log_and_print(self, message, level="info"):
         """ログファイルとコンソールの両方に出力"""
         print(message)
@@ -81,91 +591,8 @@ class GitAutoPush:
 
     def detect_platform(self):
         """実行環境を検出"""
-        system = platform.system().lower()
-        machine = platform.machine()
-        python_version = platform.python_version()
-
-        platform_info = {
-            "system": system,
-            "machine": machine,
-            "python_version": python_version,
-            "type": "unknown",
-            "name": "Unknown",
-            "shell": "unknown",
-            "home_dir": str(Path.home()),
-            "is_windows": False,
-            "is_macos": False,
-            "is_linux": False,
-            "is_wsl": False,
-        }
-
-        # Windows環境の検出
-        if system == "windows":
-            platform_info.update(
-                {
-                    "type": "windows",
-                    "name": f"Windows {platform.release()}",
-                    "shell": "cmd",
-                    "is_windows": True,
-                }
-            )
-
-            # PowerShellの検出
-            try:
-                result = subprocess.run(
-                    "pwsh --version", shell=True, capture_output=True
-                )
-                if result.returncode == 0:
-                    platform_info["shell"] = "pwsh"
-                else:
-                    result = subprocess.run(
-                        "powershell -Command $PSVersionTable.PSVersion",
-                        shell=True,
-                        capture_output=True,
-                    )
-                    if result.returncode == 0:
-                        platform_info["shell"] = "powershell"
-            except Exception:
-                pass
-
-        # macOS環境の検出
-        elif system == "darwin":
-            platform_info.update(
-                {
-                    "type": "macos",
-                    "name": f"macOS {platform.mac_ver()[0]}",
-                    "shell": "zsh",
-                    "is_macos": True,
-                }
-            )
-
-        # Linux環境の検出
-        elif system == "linux":
-            platform_info.update(
-                {
-                    "type": "linux",
-                    "name": f"Linux {platform.release()}",
-                    "shell": "bash",
-                    "is_linux": True,
-                }
-            )
-
-            # WSL環境の検出
-            try:
-                with open("/proc/version", "r") as f:
-                    version_info = f.read().lower()
-                    if "microsoft" in version_info or "wsl" in version_info:
-                        platform_info.update(
-                            {
-                                "type": "wsl",
-                                "name": f"WSL {platform.release()}",
-                                "is_wsl": True,
-                            }
-                        )
-            except Exception:
-                pass
-
-        return platform_info
+        # 検出結果はプロセス全体で共有されるため、コピーを返す
+        return dict(_detect_platform())
 
     def get_platform_specific_command(
         self, base_command, windows_cmd=None, unix_cmd=None
@@ -183,7 +610,7 @@ class GitAutoPush:
 
     def run_platform_specific_command(self, command_dict, cwd=None):
         """プラットフォーム固有のコマンドを実行"""
-        if isinstance(command_dict, str):
+        if not isinstance(command_dict, dict):
             # 単一コマンドの場合はそのまま実行
             return self.run_command(command_dict, cwd)
 
@@ -210,18 +637,20 @@ class GitAutoPush:
 
         return self.run_command(command, cwd)
 
+    @property
+    def github_cli_available(self):
+        """GitHub CLI (gh) が利用可能か（結果はキャッシュ）"""
+        if self._github_cli_available is None:
+            self._github_cli_available = self.check_github_cli()
+        return self._github_cli_available
+
     def check_github_cli(self):
         """GitHub CLI (gh) が利用可能かチェック"""
-        try:
-            result = subprocess.run("gh --version", shell=True, capture_output=True)
-            if result.returncode == 0:
-                self.debug_print("✅ GitHub CLI (gh) が利用可能です")
-                return True
-            else:
-                self.debug_print("❌ GitHub CLI (gh) が見つかりません")
-                return False
-        except Exception as e:
-            self.debug_print(f"⚠️ GitHub CLI チェックエラー: {e}")
+        if _which("gh"):
+            self.debug_print("✅ GitHub CLI (gh) が利用可能です")
+            return True
+        else:
+            self.debug_print("❌ GitHub CLI (gh) が見つかりません")
             return False
 
     def check_github_auth(self):
@@ -230,8 +659,9 @@ class GitAutoPush:
             return False
 
         try:
-            result = subprocess.run("gh auth status", shell=True, capture_output=True)
-            if result.returncode == 0:
+            if self._github_auth_future is not None:
+                self._github_auth_future.result()  # 先行して開始した確認の完了を待つ
+            if _github_auth_ok():
                 self.debug_print("✅ GitHub CLI 認証済み")
                 return True
             else:
@@ -241,6 +671,17 @@ class GitAutoPush:
             self.debug_print(f"⚠️ GitHub CLI 認証チェックエラー: {e}")
             return False
 
+    def prefetch_github_auth(self):
+        """origin がない場合、リポジトリ作成に必要な認証確認をバックグラウンドで開始"""
+        if self.no_push or not self.github_cli_available:
+            return
+        if self._github_auth_future is not None or self.has_origin_remote():
+            return
+        # gh auth status は通信を伴うため、確認の入力待ちの間に済ませておく
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._github_auth_future = executor.submit(_github_auth_ok)
+        executor.shutdown(wait=False)
+
     def get_repo_name(self):
         """リポジトリ名を取得"""
         return self.repo_path.name
@@ -251,15 +692,8 @@ class GitAutoPush:
             return None
 
         try:
-            result = subprocess.run("gh api user", shell=True, capture_output=True)
-            if result.returncode == 0:
-                stdout = (
-                    result.stdout.decode("utf-8", errors="ignore")
-                    if result.stdout
-                    else ""
-                )
-                user_data = json.loads(stdout)
-                username = user_data.get("login")
+            username = _github_username()
+            if username:
                 self.debug_print(f"👤 GitHub ユーザー名: {username}")
                 return username
         except Exception as e:
@@ -279,13 +713,19 @@ class GitAutoPush:
             return None
 
         try:
-            result = subprocess.run(
-                f"gh repo view {username}/{repo_name}",
-                shell=True,
-                capture_output=True,
-                text=True,
-            )
-            if result.returncode == 0:
+            # トークンが環境変数にあれば gh を起動せずにAPIへ直接問い合わせる
+            response = _github_api_get(f"repos/{username}/{repo_name}")
+            if response and response[0] in (200, 404):
+                exists = response[0] == 200
+            else:
+                # 終了コードのみで判定するため、出力は読み捨ててデコードもしない
+                result = subprocess.run(
+                    ["gh", "repo", "view", f"{username}/{repo_name}"],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+                exists = result.returncode == 0
+            if exists:
                 self.debug_print(
                     f"✅ GitHub リポジトリ {username}/{repo_name} が存在します"
                 )
@@ -313,33 +753,44 @@ class GitAutoPush:
             return False
         repo_name = self.get_repo_name()
         print(f"📦 GitHub リポジトリ '{repo_name}' を作成しています...")
-        print("\nリポジトリの可視性を選択してください:")
-        print("1. public (公開)")
-        print("2. private (非公開)")
-        while True:
-            choice = input("選択 (1/2): ").strip()
-            if choice == "1":
-                visibility = "--public"
-                break
-            elif choice == "2":
-                visibility = "--private"
-                break
-            else:
-                print("1 または 2 を選択してください")
-        description = self.get_user_input("リポジトリの説明 (オプション)", "")
-        cmd = (
-            f"gh repo create {repo_name} {visibility} --source=. --remote=origin --push"
-        )
+        if self.visibility:
+            visibility = f"--{self.visibility}"
+        else:
+            print("\nリポジトリの可視性を選択してください:")
+            print("1. public (公開)")
+            print("2. private (非公開)")
+            while True:
+                choice = self.ask("選択 (1/2): ", "2")  # 自動応答時は非公開で作成
+                if choice == "1":
+                    visibility = "--public"
+                    break
+                elif choice == "2":
+                    visibility = "--private"
+                    break
+                else:
+                    print("1 または 2 を選択してください")
+        description = self.description
+        if description is None:
+            description = self.get_user_input("リポジトリの説明 (オプション)", "")
+        cmd = [
+            "gh",
+            "repo",
+            "create",
+            repo_name,
+            visibility,
+            "--source=.",
+            "--remote=origin",
+            "--push",
+        ]
         if description:
-            cmd += f' --description "{description}"'
+            cmd += ["--description", description]
         try:
-            result = subprocess.run(
-                cmd, shell=True, capture_output=True, cwd=self.repo_path
-            )
+            result = subprocess.run(cmd, capture_output=True, cwd=self._cwd)
             if result.returncode == 0:
                 print(
                     f"✅ GitHub リポジトリ '{repo_name}' を作成し、リモート追加・初回pushまで完了しました"
                 )
+                self._git_config = None  # origin が追加された
                 return True
             else:
                 stderr = (
@@ -380,55 +831,55 @@ class GitAutoPush:
             print("ℹ️  GitHub リポジトリの確認をスキップしました")
             return True
 
-    def run_command(self, command, cwd=None):
-        """コマンドを実行"""
+    def run_command(
+        self, argv, cwd=None, capture=True, read_only=False, input_data=None
+    ):
+        """コマンドを実行（argvリストをシェルを介さずに実行）"""
         if cwd is None:
-            cwd = self.repo_path
+            cwd = self._cwd
+        # 読み取り専用の問い合わせではインデックスの任意ロックを取らせない
+        env = self._read_only_env if read_only else None
 
         try:
-            self.debug_print(f"🔍 実行中: {command}")
-
-            # Windows環境での文字エンコーディング問題を解決
-            # バイナリモードで実行して、適切にデコード
-            result = subprocess.run(command, shell=True, cwd=cwd, capture_output=True)
-
-            # バイナリ出力を安全にデコード
-            def safe_decode(data):
-                if not data:
-                    return ""
-
-                # 複数のエンコーディングを試行
-                encodings = ["utf-8", "cp932", "shift_jis", "iso-8859-1"]
-
-                for encoding in encodings:
-                    try:
-                        return data.decode(encoding)
-                    except (UnicodeDecodeError, LookupError):
-                        continue
-
-                # 全て失敗した場合は、エラーを無視してデコード
-                return data.decode("utf-8", errors="ignore")
-
-            stdout = safe_decode(result.stdout)
-            stderr = safe_decode(result.stderr)
-
-            # 結果オブジェクトを作成
-            class Result:
-                def __init__(self, returncode, stdout, stderr):
-                    self.returncode = returncode
-                    self.stdout = stdout
-                    self.stderr = stderr
-
-            decoded_result = Result(
-                result.returncode, stdout, stderr
-            )  # git initは成功時でも標準エラー出力に出力することがある
-            if decoded_result.returncode == 0:
-                self.debug_print(f"✅ 成功: stdout={stdout}, stderr={stderr}")
-                return decoded_result
+            self.debug_print(f"🔍 実行中: {' '.join(argv)}")
+
+            # 実行ファイルはPATHから一度だけ解決してキャッシュする
+            executable = _which(argv[0]) or argv[0]
+
+            if capture:
+                # Windows環境での文字エンコーディング問題を解決
+                # git/gh の出力はUTF-8のため、デコードできないバイトは置換して読む
+                result = subprocess.run(
+                    [executable, *argv[1:]],
+                    cwd=cwd,
+                    env=env,
+                    capture_output=True,
+                    encoding="utf-8",
+                    errors="replace",
+                    input=input_data,
+                )
             else:
-                self.last_error = stderr
+                # 出力を解析しないコマンドは端末に直接出力させ、進捗をそのまま表示する
+                sys.stdout.flush()
+                result = subprocess.run(
+                    [executable, *argv[1:]], cwd=cwd, env=env, input=input_data
+                )
+
+            # git initは成功時でも標準エラー出力に出力することがある
+            if result.returncode == 0:
+                self.debug_print(
+                    "✅ 成功: stdout=%s, stderr=%s", result.stdout, result.stderr
+                )
+                return result
+            else:
+                if capture:
+                    self.last_error = result.stderr
+                else:
+                    self.last_error = f"終了コード {result.returncode}"
                 self.debug_print(
-                    f"❌ 失敗: returncode={decoded_result.returncode}, stderr={stderr}"
+                    "❌ 失敗: returncode=%s, stderr=%s",
+                    result.returncode,
+                    result.stderr,
                 )
                 return None
         except Exception as e:
@@ -436,21 +887,53 @@ class GitAutoPush:
             self.debug_print(f"⚠️ 例外: {e}")
             return None
 
-    def debug_print(self, message):
-        """デバッグメッセージを出力"""
+    def iter_command_records(self, argv, separator=b"\0", read_only=False):
+        """コマンドの出力を区切り文字ごとに逐次返す（出力全体をメモリに溜めない）"""
+        self.debug_print(f"🔍 実行中: {' '.join(argv)}")
+        # stderr もパイプにすると、stdout を読み切る前にパイプが満杯になり
+        # git が書き込みで止まって双方が待ち続けるため、一時ファイルに受ける
+        with tempfile.TemporaryFile() as stderr_file, subprocess.Popen(
+            [_which(argv[0]) or argv[0], *argv[1:]],
+            cwd=self._cwd,
+            env=self._read_only_env if read_only else None,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+        ) as process:
+            pending = b""
+            for chunk in iter(lambda: process.stdout.read(65536), b""):
+                *records, pending = (pending + chunk).split(separator)
+                for record in records:
+                    yield record.decode("utf-8", errors="replace")
+            if pending:
+                yield pending.decode("utf-8", errors="replace")
+
+            if process.wait() != 0:
+                stderr_file.seek(0)
+                self.last_error = stderr_file.read().decode("utf-8", errors="replace")
+                raise subprocess.CalledProcessError(
+                    process.returncode, argv, stderr=self.last_error
+                )
+
+    def debug_print(self, message, *args):
+        """デバッグメッセージを出力（args は必要なときだけ % で埋め込む）"""
         if self.debug:
+            if args:
+                message = message % args
             self.log_and_print(f"🔍 {message}", "debug")
-        else:
-            self.logger.debug(f"🔍 {message}")  # ログファイルにのみ記録
+        elif self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("🔍 " + message, *args)  # ログファイルにのみ記録
 
     def analyze_current_directory(self):
         """現在のディレクトリの状況を分析して適切な処理を判断"""
         print("📁 現在のディレクトリを分析中...")
 
+        # 空フォルダ判定とソースファイル判定は1回の走査でまとめて行う
+        is_empty, has_source_files = self.scan_directory()
+
         analysis = {
             "is_git_repo": self.is_git_repo(),
-            "is_empty": self.is_directory_empty(),
-            "has_source_files": self.has_source_files(),
+            "is_empty": is_empty,
+            "has_source_files": has_source_files,
             "is_system_folder": self.is_system_folder(),
             "is_nested_repo": self.is_nested_in_git_repo(),
             "folder_type": "unknown",
@@ -503,139 +986,65 @@ class GitAutoPush:
 
         return analysis
 
-    def is_directory_empty(self):
-        """ディレクトリが空かどうかチェック"""
-        try:
-            return len(list(self.repo_path.iterdir())) == 0
-        except Exception:
-            return False
-
-    def has_source_files(self):
-        """ソースファイルが含まれているかチェック"""
-        source_extensions = {
-            ".py",
-            ".js",
-            ".ts",
-            ".java",
-            ".cpp",
-            ".c",
-            ".cs",
-            ".php",
-            ".rb",
-            ".go",
-            ".rs",
-            ".swift",
-            ".kt",
-            ".scala",
-            ".sh",
-            ".bat",
-            ".html",
-            ".css",
-            ".vue",
-            ".jsx",
-            ".tsx",
-            ".json",
-            ".xml",
-            ".yaml",
-            ".yml",
-            ".md",
-            ".txt",
-            ".sql",
-            ".r",
-            ".m",
-            ".pl",
-        }
-
-        config_files = {
-            "package.json",
-            "requirements.txt",
-            "Cargo.toml",
-            "pom.xml",
-            "build.gradle",
-            "Makefile",
-            "CMakeLists.txt",
-            "setup.py",
-            "pyproject.toml",
-            "composer.json",
-            "Gemfile",
-            "go.mod",
-        }
-
+    def scan_directory(self):
+        """ディレクトリを1回だけ走査し、(空かどうか, ソースファイルの有無) を返す"""
+        is_empty = True
         try:
-            for item in self.repo_path.iterdir():
-                if item.is_file():
-                    # ファイル拡張子のチェック
-                    if item.suffix.lower() in source_extensions:
-                        return True
-                    # 設定ファイルのチェック
-                    if item.name in config_files:
-                        return True
-                elif item.is_dir() and item.name in {
-                    "src",
-                    "lib",
-                    "app",
-                    "components",
-                    "modules",
-                }:
-                    # 一般的なソースディレクトリのチェック
-                    return True
-            return False
+            with os.scandir(self._cwd) as entries:
+                for entry in entries:
+                    is_empty = False
+                    name = entry.name
+                    # シンボリックリンクは辿らず、プロジェクトの外や循環を走査しない
+                    if entry.is_file(follow_symlinks=False):
+                        # ファイル拡張子のチェック
+                        if os.path.splitext(name)[1].lower() in _SOURCE_EXTENSIONS:
+                            return False, True
+                        # 設定ファイルのチェック
+                        if name in _CONFIG_FILES:
+                            return False, True
+                    elif name in _SOURCE_DIRS and entry.is_dir(follow_symlinks=False):
+                        # 一般的なソースディレクトリのチェック
+                        return False, True
+            return is_empty, False
         except Exception:
-            return False
+            return False, False
 
     def is_system_folder(self):
         """システムフォルダかどうかチェック"""
-        path_str = str(self.repo_path).lower()
-
-        # Windows システムフォルダ
-        windows_system_paths = [
-            "c:\\windows",
-            "c:\\program files",
-            "c:\\program files (x86)",
-            "c:\\programdata",
-            "c:\\users\\public",
-            "c:\\system volume information",
-            "\\appdata\\",
-            "\\temp\\",
-            "\\tmp\\",
-        ]
-
-        # Unix系 システムフォルダ
-        unix_system_paths = [
-            "/bin",
-            "/sbin",
-            "/usr/bin",
-            "/usr/sbin",
-            "/etc",
-            "/var",
-            "/tmp",
-            "/sys",
-            "/proc",
-            "/dev",
-            "/boot",
-            "/root",
-        ]
+        path_str = self._cwd.lower()
 
-        system_paths = (
-            windows_system_paths
+        system_path_re = (
+            _WINDOWS_SYSTEM_PATH_RE
             if self.platform_info["is_windows"]
-            else unix_system_paths
+            else _UNIX_SYSTEM_PATH_RE
         )
 
-        for sys_path in system_paths:
-            if sys_path in path_str:
-                return True
-
-        return False
+        return system_path_re.search(path_str) is not None
 
     def is_nested_in_git_repo(self):
-        """既存のGitリポジトリ内にネストされているかチェック"""
+        """既存のGitリポジトリ内にネストされているかチェック（結果はキャッシュ）"""
         if self.is_git_repo():
             return False  # 自分自身がリポジトリなら、ネストではない
 
+        if self._nested is None:
+            self._nested = self._find_parent_git_dir()
+        return self._nested
+
+    def _find_parent_git_dir(self):
+        """親ディレクトリを遡って.gitを探す（gitと同様にファイルシステム境界で停止）"""
+        try:
+            device = os.stat(self._cwd).st_dev
+        except OSError:
+            return False
+
         current = self.repo_path.parent
         while current != current.parent:  # ルートに達するまで
-            if (current / ".git").exists():
+            try:
+                if os.stat(current).st_dev != device:
+                    return False  # 別のファイルシステムに到達
+            except OSError:
+                return False
+            if os.path.exists(current / ".git"):
                 return True
             current = current.parent
         return False
@@ -682,19 +1091,25 @@ class GitAutoPush:
 
         if analysis["is_system_folder"]:
             print("\n⚠️ システムフォルダでのgit init は危険です！")
-            return self.confirm_action("本当に続行しますか？（推奨: いいえ）")
+            return self.confirm_action(
+                "本当に続行しますか？（推奨: いいえ）", dangerous=True
+            )
 
         if analysis["is_nested_repo"]:
             print("\n⚠️ 既存のGitリポジトリ内での git init は推奨されません")
             print("サブモジュールやサブツリーの使用を検討してください")
-            return self.confirm_action("それでも git init を実行しますか？")
+            return self.confirm_action(
+                "それでも git init を実行しますか？", dangerous=True
+            )
 
         if not analysis["git_init_recommended"]:
-            return self.confirm_action("git init を実行してもよろしいですか？")
+            return self.confirm_action(
+                "git init を実行してもよろしいですか？", dangerous=True
+            )
 
         return True  # 推奨される場合は自動的に続行
 
-    def init_git_repo(self):
+    def init_git_repo(self, analysis=None):
         """Gitリポジトリを初期化（ディレクトリ分析付き）"""
         print("🔧 Gitリポジトリ初期化の準備中...")
 
@@ -703,9 +1118,10 @@ class GitAutoPush:
             print("✅ 既にGitリポジトリとして初期化されています")
             return True
 
-        # ディレクトリ分析
-        analysis = self.analyze_current_directory()
-        self.print_directory_analysis(analysis)
+        # ディレクトリ分析（呼び出し元で分析済みならその結果を使う）
+        if analysis is None:
+            analysis = self.analyze_current_directory()
+            self.print_directory_analysis(analysis)
 
         # git init 実行の判断
         if not self.should_proceed_with_git_init(analysis):
@@ -714,9 +1130,10 @@ class GitAutoPush:
 
         # Gitリポジトリの初期化
         print("🔧 git init を実行中...")
-        result = self.run_command("git init")
+        result = self.run_command(["git", "init"])
         if result:
             print("✅ Gitリポジトリを初期化しました")
+            self.invalidate_git_cache()
 
             # 初期化後の推奨アクション
             self.suggest_post_init_actions(analysis)
@@ -742,66 +1159,60 @@ class GitAutoPush:
         print("🔗 リモートリポジトリ（GitHub等）の設定をお勧めします")
 
     def is_git_repo(self):
-        """Gitリポジトリかどうかをチェック"""
-        return self.git_path.exists()
+        """Gitリポジトリかどうかをチェック（結果はキャッシュ）"""
+        if self._is_git_repo is None:
+            # サブモジュール等では .git がファイルの場合もあるため exists で判定
+            self._is_git_repo = os.path.exists(self._git_path_str)
+        return self._is_git_repo
+
+    def ask(self, prompt, auto_answer=""):
+        """入力を1行読む（自動応答モードでは入力を待たずに auto_answer を返す）"""
+        if self.assume_yes:
+            print(f"{prompt}{auto_answer}（自動応答）")
+            return auto_answer
+        return input(prompt).strip()
 
     def get_user_input(self, prompt, default=None):
         """ユーザー入力を取得"""
         if default:
-            user_input = input(f"{prompt} [{default}]: ").strip()
+            user_input = self.ask(f"{prompt} [{default}]: ")
             return user_input if user_input else default
         else:
-            return input(f"{prompt}: ").strip()
+            return self.ask(f"{prompt}: ")
 
-    def confirm_action(self, message):
-        """アクションの確認"""
+    def confirm_action(self, message, dangerous=False):
+        """アクションの確認（自動応答モードでは dangerous な確認のみ「いいえ」）"""
+        if self._confirm_all and not dangerous:
+            print(f"{message} (y/n): y（一括承認済み）")
+            return True
         while True:
-            response = input(f"{message} (y/n): ").strip().lower()
-            if response in ["y", "yes"]:
-                return True
-            elif response in ["n", "no"]:
-                return False
-            else:
-                print("'y' または 'n' を入力してください")
+            response = self.ask(f"{message} (y/n): ", "n" if dangerous else "y").lower()
+            answer = _CONFIRM_ANSWERS.get(response)
+            if answer is not None:
+                return answer
+            print("'y' または 'n' を入力してください")
 
     def check_git_processes(self):
         """実行中のGitプロセスをチェック"""
         self.debug_print("🔍 実行中のGitプロセスをチェック中...")
 
-        # プラットフォーム別のプロセス確認コマンド
-        process_commands = {
-            "windows": 'tasklist /FI "IMAGENAME eq git.exe"',
-            "unix": "ps aux | grep git",
-            "wsl": "ps aux | grep git",
-            "default": "ps aux | grep git",
-        }
-
         try:
-            result = self.run_platform_specific_command(process_commands)
-            if not result:
-                self.debug_print("⚠️ プロセスチェックコマンドの実行に失敗")
-                return False
-
-            stdout = result.stdout
-
-            # プラットフォーム別の結果解析
-            if self.platform_info["is_windows"]:
-                if "git.exe" in stdout:
-                    print("⚠️  実行中のGitプロセスが見つかりました:")
-                    print(stdout)
-                    return True
+            if psutil is not None:
+                git_processes = self.find_git_processes()
+            elif os.path.isdir("/proc/self"):
+                # Linux/WSL では /proc を直接読み、ps を起動しない
+                git_processes = self.find_git_processes_in_proc()
             else:
-                # Unix系（Linux、macOS、WSL）
-                git_processes = [
-                    line
-                    for line in stdout.split("\n")
-                    if "git" in line and "grep" not in line and line.strip()
-                ]
-                if git_processes:
-                    print("⚠️  実行中のGitプロセスが見つかりました:")
-                    for process in git_processes:
-                        print(process)
-                    return True
+                git_processes = self.find_git_processes_by_command()
+                if git_processes is None:
+                    self.debug_print("⚠️ プロセスチェックコマンドの実行に失敗")
+                    return False
+
+            if git_processes:
+                print("⚠️  実行中のGitプロセスが見つかりました:")
+                for process in git_processes:
+                    print(process)
+                return True
 
             self.debug_print("✅ 実行中のGitプロセスはありません")
             return False
@@ -809,40 +1220,84 @@ class GitAutoPush:
             self.debug_print(f"⚠️ プロセスチェックエラー: {e}")
             return False
 
+    def find_git_processes(self):
+        """psutilでプロセス一覧を直接読み取り、Gitプロセスを列挙"""
+        git_processes = []
+        for process in psutil.process_iter(["pid", "name", "cmdline"]):
+            # git本体と git-remote-https などのヘルパーのみを対象にする
+            if _is_git_process_name(process.info["name"] or ""):
+                cmdline = " ".join(process.info["cmdline"] or [])
+                git_processes.append(
+                    f"{process.info['pid']} {cmdline or process.info['name']}"
+                )
+        return git_processes
+
+    def find_git_processes_in_proc(self):
+        """/proc を走査し、プロセス名が git/git-* のプロセスを列挙"""
+        git_processes = []
+        for pid in os.listdir("/proc"):
+            if not pid.isdigit():
+                continue
+            try:
+                with open(f"/proc/{pid}/comm", "rb") as f:
+                    name = f.read().strip()
+                if not _is_git_process_name(name.decode("utf-8", errors="replace")):
+                    continue
+                with open(f"/proc/{pid}/cmdline", "rb") as f:
+                    cmdline = f.read().replace(b"\0", b" ").strip()
+            except OSError:
+                continue  # 走査中に終了したプロセスなど
+            cmdline = (cmdline or name).decode("utf-8", errors="replace")
+            git_processes.append(f"{pid} {cmdline}")
+        return git_processes
+
+    def find_git_processes_by_command(self):
+        """OSのコマンドでプロセス一覧を取得し、Gitプロセスを列挙"""
+        # プラットフォーム別のプロセス確認コマンド
+        process_commands = {
+            "windows": ["tasklist", "/FI", "IMAGENAME eq git.exe"],
+            # 1列目にPID、2列目以降に引数を出し、実行ファイル名で判定できるようにする
+            "unix": ["ps", "-A", "-o", "pid=,args="],
+            "wsl": ["ps", "-A", "-o", "pid=,args="],
+            "default": ["ps", "-A", "-o", "pid=,args="],
+        }
+
+        result = self.run_platform_specific_command(process_commands)
+        if not result:
+            return None
+
+        stdout = result.stdout
+
+        # プラットフォーム別の結果解析
+        if self.platform_info["is_windows"]:
+            return [stdout] if "git.exe" in stdout else []
+
+        # Unix系（Linux、macOS、WSL）
+        # 行全体の部分一致ではなく argv[0] の実行ファイル名で判定する（エディタや gitk を除く）
+        git_processes = []
+        for line in stdout.split("\n"):
+            fields = line.split(None, 2)
+            if len(fields) >= 2 and _is_git_process_name(os.path.basename(fields[1])):
+                git_processes.append(line.strip())
+        return git_processes
+
     def clean_git_locks(self):
         """全てのGitロックファイルを強制的にクリーンアップ"""
         print("🧹 Gitロックファイルを強制クリーンアップ中...")
-        lock_patterns = [
-            "index.lock",
-            "HEAD.lock",
-            "config.lock",
-            "refs/heads/*.lock",
-            "refs/remotes/*/**.lock",
-        ]
+        # 直接のファイル（.git を1回走査して取得）
+        lock_files = [lock_file for lock_file, _ in self.find_git_locks()]
+        # refs配下のロックファイル
+        for ref_dir in _GIT_LOCK_REF_DIRS:
+            lock_files.extend(_iter_lock_files(self.git_path / ref_dir))
 
         cleaned = 0
-        for pattern in lock_patterns:
-            lock_path = self.git_path / pattern
-            # 直接のファイル
-            if lock_path.exists():
-                try:
-                    lock_path.unlink()
-                    print(f"✅ 削除: {lock_path}")
-                    cleaned += 1
-                except Exception as e:
-                    print(f"❌ 削除失敗: {lock_path} - {e}")
-
-            # パターンマッチング
-            if "*" in pattern:
-                parent_dir = self.git_path / pattern.split("*")[0].rstrip("/")
-                if parent_dir.exists():
-                    for lock_file in parent_dir.rglob("*.lock"):
-                        try:
-                            lock_file.unlink()
-                            print(f"✅ 削除: {lock_file}")
-                            cleaned += 1
-                        except Exception as e:
-                            print(f"❌ 削除失敗: {lock_file} - {e}")
+        for lock_file in lock_files:
+            try:
+                os.unlink(lock_file)
+                print(f"✅ 削除: {lock_file}")
+                cleaned += 1
+            except Exception as e:
+                print(f"❌ 削除失敗: {lock_file} - {e}")
 
         if cleaned > 0:
             print(f"🎯 {cleaned}個のロックファイルを削除しました")
@@ -851,20 +1306,33 @@ class GitAutoPush:
 
         return cleaned > 0
 
-    def check_git_locks(self):
+    def find_git_locks(self):
+        """.git直下のロックファイルを (パス, 作成からの秒数) のリストで返す"""
+        locks = []
+        try:
+            with os.scandir(self._git_path_str) as entries:
+                now = time.time()
+                for entry in entries:
+                    if entry.name in _GIT_LOCK_FILES:
+                        locks.append((Path(entry.path), now - entry.stat().st_mtime))
+        except OSError:
+            pass  # .git が存在しない（未初期化）かファイルの場合
+        return locks
+
+    def check_git_locks(self, locks=None):
         """Gitロックファイルをチェック"""
         self.debug_print("🔍 Gitロックファイルをチェック中...")
-        lock_files = [
-            self.git_path / "index.lock",
-            self.git_path / "HEAD.lock",
-            self.git_path / "config.lock",
-        ]
+        if locks is None:
+            locks = self.find_git_locks()
 
         found_locks = []
-        for lock_file in lock_files:
-            if lock_file.exists():
-                print(f"⚠️  ロックファイル発見: {lock_file}")
-                found_locks.append(lock_file)
+        for lock_file, age in locks:
+            if age < _STALE_LOCK_SECONDS:
+                # 作成直後のロックは実行中のgitが保持している可能性が高いため削除対象にしない
+                print(f"ℹ️  使用中のロックファイル: {lock_file}（{age:.0f}秒前に作成）")
+                continue
+            print(f"⚠️  ロックファイル発見: {lock_file}")
+            found_locks.append(lock_file)
 
         if found_locks:
             print("ロックファイルが見つかりました。以下から選択してください:")
@@ -872,13 +1340,17 @@ class GitAutoPush:
             print("2. 全て削除")
             print("3. スキップ")
 
-            choice = input("選択 (1/2/3): ").strip()
+            if self.force_unlock:
+                print("選択 (1/2/3): 2（--force-unlock）")
+                choice = "2"
+            else:
+                choice = self.ask("選択 (1/2/3): ", "3")  # 自動応答時は削除しない
 
             if choice == "1":
                 for lock_file in found_locks:
                     if self.confirm_action(f"{lock_file}を削除しますか？"):
                         try:
-                            lock_file.unlink()
+                            os.unlink(lock_file)
                             print(f"✅ ロックファイル削除: {lock_file}")
                         except Exception as e:
                             print(f"❌ ロックファイル削除失敗: {lock_file} - {e}")
@@ -892,69 +1364,240 @@ class GitAutoPush:
             self.debug_print("✅ ロックファイルはありません")
             return False
 
+    def collect_repo_snapshot(self):
+        """ブランチ情報と変更ファイルを1回の git status でまとめて取得（結果はキャッシュ）"""
+        if self._snapshot is None:
+            # porcelain=v2 --branch はブランチ名・upstream・ahead/behind も同時に出力する
+            # 未追跡ディレクトリは中身を列挙せず1行にまとめる（-unormal）
+            # -z ではパスが引用符付きにならず、改行を含むファイル名も正しく区切れる
+            records = self.iter_command_records(
+                ["git", "status", "--porcelain=v2", "--branch", "-unormal", "-z"],
+                read_only=True,
+            )
+            snapshot = {
+                "branch": None,
+                "upstream": None,
+                "ahead": 0,
+                "behind": 0,
+                "changes": [],
+                "paths": [],
+            }
+            try:
+                self._parse_status_records(records, snapshot)
+            except (OSError, subprocess.CalledProcessError) as e:
+                self.debug_print(f"⚠️ git status の取得に失敗: {e}")
+                return None
+            self.debug_print("📋 リポジトリ状態: %s", snapshot)
+            if snapshot["branch"]:
+                self._upstreams[snapshot["branch"]] = snapshot["upstream"]
+            self._snapshot = snapshot
+        return self._snapshot
+
+    def _parse_status_records(self, records, snapshot):
+        """git status --porcelain=v2 -z のレコードを解析してスナップショットに格納"""
+        changes = snapshot["changes"]
+        # git add にそのまま渡せるパス（インデックスだけの変更はステージング済みのため除く）
+        paths = snapshot["paths"]
+        for line in records:
+            kind = line[:1]
+            if kind == "#":
+                # "# branch.<key> <value>" 形式のヘッダー行
+                _, key, value = line.split(" ", 2)
+                if key == "branch.head":
+                    if value != "(detached)":
+                        snapshot["branch"] = value
+                elif key == "branch.upstream":
+                    snapshot["upstream"] = value
+                elif key == "branch.ab":
+                    ahead, behind = value.split()
+                    snapshot["ahead"] = int(ahead)
+                    snapshot["behind"] = -int(behind)
+            elif kind == "1":
+                fields = line.split(" ", 8)
+                changes.append(f"{fields[1].replace('.', ' ')} {fields[8]}")
+                if fields[1][1] != ".":
+                    paths.append(fields[8])
+            elif kind == "2":
+                fields = line.split(" ", 9)
+                path = fields[9]
+                orig_path = next(records, "")  # 移動元のパスは次のレコード
+                xy = fields[1].replace(".", " ")
+                changes.append(f"{xy} {orig_path} -> {path}")
+                # 移動元はインデックス上で削除済みのため、移動先だけを渡す
+                if fields[1][1] != ".":
+                    paths.append(path)
+            elif kind == "u":
+                fields = line.split(" ", 10)
+                changes.append(f"{fields[1]} {fields[10]}")
+                paths.append(fields[10])
+            elif kind == "?":
+                changes.append(f"?? {line[2:]}")
+                paths.append(line[2:])
+
     def get_status(self):
-        """git statusを取得"""
-        result = self.run_command("git status --porcelain -u")
-        if result:
-            return result.stdout.strip()
+        """git statusを取得（porcelain v1 と同じ "XY パス" 形式の行）"""
+        snapshot = self.collect_repo_snapshot()
+        if snapshot:
+            return "\n".join(snapshot["changes"])
         return ""
 
     def has_changes(self):
         """変更があるかどうかをチェック"""
-        status = self.get_status()
-        return bool(status)
+        snapshot = self.collect_repo_snapshot()
+        return bool(snapshot and snapshot["changes"])
+
+    def invalidate_git_cache(self):
+        """キャッシュしたgit問い合わせ結果を破棄"""
+        self._branches = None
+        self._head_branch = None
+        self._nested = None
+        self._is_git_repo = None
+        self._snapshot = None
 
     def get_branches(self):
-        """利用可能なブランチを取得"""
-        result = self.run_command("git branch")
-        if result:
+        """利用可能なブランチを取得（結果はキャッシュ）"""
+        if self._branches is None:
+            # for-each-ref は人間向けの整形を行わないため git branch より軽量
+            # %(HEAD) で現在のブランチも同じ呼び出しで取得する
+            result = self.run_command(
+                [
+                    "git",
+                    "for-each-ref",
+                    "--format=%(HEAD) %(refname:short)",
+                    "refs/heads/",
+                ],
+                read_only=True,
+            )
+            if not result:
+                return ["main"]
             branches = []
-            for line in result.stdout.strip().split("\n"):
-                branch = line.strip().replace("* ", "")
-                if branch:
-                    branches.append(branch)
-            return branches
-        return ["main"]
+            for line in result.stdout.splitlines():
+                if not line:
+                    continue
+                branch = line[2:]
+                if line[0] == "*":
+                    self._head_branch = branch
+                branches.append(branch)
+            self._branches = branches
+        return list(self._branches)
+
+    def read_head_branch(self):
+        """.git/HEAD から現在のブランチ名を読む（デタッチ状態や読めない場合は None）"""
+        try:
+            with open(os.path.join(self._git_path_str, "HEAD"), encoding="utf-8") as f:
+                head = f.readline().strip()
+        except OSError:
+            return None  # .git がファイル（ワークツリー等）の場合もここに来る
+        if head.startswith("ref: refs/heads/"):
+            return head[len("ref: refs/heads/") :]
+        return None
 
     def get_current_branch(self):
         """現在のブランチを取得"""
-        result = self.run_command("git branch --show-current")
+        # status の結果が既にあればそれを使い、なければブランチ一覧と一緒に取得する
+        if self._snapshot:
+            branch = self._snapshot["branch"]
+        else:
+            # .git/HEAD を直接読めればgitを起動しない
+            branch = self.read_head_branch()
+        if not branch:
+            self.get_branches()
+            branch = self._head_branch
+        if branch:
+            return branch
+
+        # 初回コミット前などはブランチ名を直接問い合わせる
+        result = self.run_command(["git", "branch", "--show-current"], read_only=True)
         if result and result.stdout.strip():
             return result.stdout.strip()
         return "main"
 
-    def add_all(self):
+    def add_all(self, snapshot=None):
         """すべての変更をステージング"""
         print("📁 変更をステージング中...")
-        result = self.run_command("git add .")
+        result = None
+        if snapshot and not snapshot["paths"]:
+            # 作業ツリー側の変更がなければ、すべてステージング済み
+            result = True
+        elif snapshot:
+            # 変更のあったパスだけを渡し、作業ツリー全体の走査を省く
+            # （対象はスナップショット取得時点の変更に限られる）
+            # --literal-pathspecs でファイル名中の * や ? をワイルドカードとして扱わない
+            result = self.run_command(
+                [
+                    "git",
+                    "--literal-pathspecs",
+                    "add",
+                    "--pathspec-from-file=-",
+                    "--pathspec-file-nul",
+                ],
+                input_data="\0".join(snapshot["paths"]),
+            )
+            if not result:
+                self.debug_print(
+                    "⚠️ パス指定でのステージングに失敗: %s", self.last_error
+                )
+        if not result:
+            # パス指定で失敗した場合（git 2.25 未満など）は、従来どおり全体を対象にする
+            result = self.run_command(["git", "add", "."], capture=False)
         if result:
             print("✅ ステージング完了")
+            self._snapshot = None  # インデックスが変わったため再取得させる
             return True
         return False
 
+    def read_git_config(self):
+        """ユーザー名・メールアドレス・origin のURLを1回の git config で取得（結果はキャッシュ）"""
+        if self._git_config is None:
+            result = self.run_command(
+                ["git", "config", "--get-regexp", _GIT_CONFIG_PATTERN],
+                read_only=True,
+            )
+            config = {}
+            if result:
+                for line in result.stdout.splitlines():
+                    key, _, value = line.partition(" ")
+                    config[key] = value.strip()
+            self._git_config = config
+        return self._git_config
+
     def ensure_git_identity(self):
-        # ユーザー名
-        name_result = self.run_command("git config user.name")
-        if not name_result or not name_result.stdout.strip():
-            self.run_command('git config user.name "Auto Committer"')
-        # メールアドレス
-        email_result = self.run_command("git config user.email")
-        if not email_result or not email_result.stdout.strip():
-            self.run_command('git config user.email "autocommit@example.com"')
-
-    def commit(self, message=None):
-        self.ensure_git_identity()  # ユーザー名・メールアドレスを自動設定
+        """未設定のユーザー名・メールアドレスを補う git -c オプションを返す（結果はキャッシュ）"""
+        if self._identity_args is None and all(
+            os.environ.get(name) for name in _GIT_IDENTITY_ENV_VARS
+        ):
+            # CI等で環境変数から作成者・コミッターが与えられていればgit設定は参照しない
+            self._identity_args = []
+        if self._identity_args is None:
+            configured = self.read_git_config()
+
+            # 設定を書き込む代わりに、コミット時の -c で一時的に指定する
+            overrides = []
+            for key, default in _DEFAULT_GIT_IDENTITY:
+                if not configured.get(key):
+                    overrides += ["-c", f"{key}={default}"]
+            self._identity_args = overrides
+        return list(self._identity_args)
+
+    def commit(self, message=None, stage_tracked=False):
+        # ユーザー名・メールアドレスが未設定ならコミットと同じ呼び出しで補う
+        identity_args = self.ensure_git_identity()
         if not message:
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
             default_message = f"Auto commit: {timestamp}"
             message = self.get_user_input(
                 "コミットメッセージを入力してください", default_message
             )
 
         print(f"💾 コミット中: {message}")
-        result = self.run_command(f'git commit -m "{message}"')
+        commit_cmd = ["git", *identity_args, "commit", "-m", message]
+        # 追跡中のファイルの変更を同じ呼び出しでステージング
+        if stage_tracked:
+            commit_cmd.append("-a")
+        result = self.run_command(commit_cmd)
         if result:
             print("✅ コミット完了")
+            self.invalidate_git_cache()
             return True
         return False
 
@@ -978,114 +1621,125 @@ class GitAutoPush:
             return False
 
         print(f"🚀 {branch}ブランチにプッシュ中...")
-        push_cmd = f"git push origin {branch}"
+        # upstream 未設定のときだけ -u を付け、既存の追跡設定を書き換えない
+        push_cmd = ["git", "push", "origin", branch]
+        if not self.has_upstream(branch):
+            push_cmd.insert(2, "-u")
         if force:
-            push_cmd += " --force"
-        result = self.run_command(push_cmd)
-        if result:
+            push_cmd.insert(2, "--force")  # ブランチ名を末尾に保つ
+
+        if self.run_command(push_cmd, capture=False):
             print("✅ プッシュ完了")
+            self._pushed(branch)
             return True
-        else:
-            # リモートリポジトリが存在しない場合は自動作成
-            print("🔄 プッシュに失敗しました。リモートリポジトリを確認中...")
-            remote_url_result = self.run_command("git remote get-url origin")
-            if not remote_url_result or not remote_url_result.stdout.strip():
-                print(
-                    "⚠️  リモートリポジトリが設定されていません。GitHubリポジトリを作成します。"
-                )
-                if self.create_github_repo():
-                    print(
-                        "🔄 リモートリポジトリが設定されました。再度プッシュします..."
-                    )
-                    result = self.run_command(f"git push -u origin {branch}")
-                    if result:
-                        print("✅ プッシュ完了")
-                        return True
-                    else:
-                        print("❌ プッシュに失敗しました")
-                        return False
-                else:
-                    print("❌ GitHubリポジトリの作成に失敗しました")
-                    return False
-            else:
-                # 既存リモートがある場合は upstream 設定で再試行
-                print("🔄 初回プッシュのようです。upstream を設定してリトライします...")
-                result = self.run_command(f"git push -u origin {branch}")
-                if result:
-                    print("✅ プッシュ完了")
-                    return True
+
+        # リモートリポジトリが存在しない場合は自動作成
+        print("🔄 プッシュに失敗しました。リモートリポジトリを確認中...")
+        if self.has_origin_remote():
+            return False  # origin はあるため、プッシュ自体の失敗
+
+        print(
+            "⚠️  リモートリポジトリが設定されていません。GitHubリポジトリを作成します。"
+        )
+        if not self.create_github_repo():
+            print("❌ GitHubリポジトリの作成に失敗しました")
+            return False
+
+        # gh repo create --push で現在のブランチはプッシュ済み
+        if branch == self.get_current_branch():
+            self._pushed(branch)
+            return True
+
+        print("🔄 リモートリポジトリが設定されました。再度プッシュします...")
+        if self.run_command(push_cmd, capture=False):
+            print("✅ プッシュ完了")
+            self._pushed(branch)
+            return True
+        print("❌ プッシュに失敗しました")
         return False
 
+    def has_upstream(self, branch):
+        """ブランチに upstream が設定されているかチェック"""
+        if branch not in self._upstreams:
+            # git status で見ていないブランチは設定を直接参照する
+            result = self.run_command(
+                ["git", "config", "--get", f"branch.{branch}.merge"], read_only=True
+            )
+            self._upstreams[branch] = (
+                result.stdout.strip() if result and result.stdout.strip() else None
+            )
+        return self._upstreams[branch] is not None
+
+    def _pushed(self, branch):
+        """プッシュ成功後にキャッシュを更新"""
+        self._snapshot = None  # upstream との ahead/behind が変わるため破棄
+        if self._upstreams.get(branch) is None:
+            self._upstreams[branch] = f"origin/{branch}"  # -u で設定された
+
+    def has_origin_remote(self):
+        """リモート origin が設定されているかチェック"""
+        return bool(self.read_git_config().get("remote.origin.url"))
+
     def open_github_repo_in_browser(self):
         """GitHub リポジトリをブラウザで開く"""
-        if not self.github_cli_available:
-            print("⚠️  GitHub CLI が利用できないため、ブラウザでの確認をスキップします")
-            return False
+        # origin のURLが分かればユーザー名の問い合わせは不要（組織のリポジトリも正しく開ける）
+        repo_url = _github_web_url(self.read_git_config().get("remote.origin.url"))
+        if not repo_url:
+            if not self.github_cli_available:
+                print(
+                    "⚠️  GitHub CLI が利用できないため、ブラウザでの確認をスキップします"
+                )
+                return False
 
-        repo_name = self.get_repo_name()
-        username = self.get_github_username()
+            repo_name = self.get_repo_name()
+            username = self.get_github_username()
 
-        if not username:
-            print("⚠️  GitHub ユーザー名を取得できませんでした")
-            return False
+            if not username:
+                print("⚠️  GitHub ユーザー名を取得できませんでした")
+                return False
 
-        repo_url = f"https://github.com/{username}/{repo_name}"
+            repo_url = f"https://github.com/{username}/{repo_name}"
 
-        try:
-            print("🌐 GitHubリポジトリをブラウザで開いています...")
-            print(f"🔗 URL: {repo_url}")
-            webbrowser.open(repo_url)
-            print("✅ ブラウザでGitHubリポジトリを開きました")
-            return True
-        except Exception as e:
-            print(f"❌ ブラウザでの表示に失敗しました: {e}")
-            print(f"🔗 手動で以下のURLにアクセスしてください: {repo_url}")
+        print("🌐 GitHubリポジトリをブラウザで開いています...")
+        print(f"🔗 URL: {repo_url}")
+        if not _open_browser(repo_url):
             return False
+        print("✅ ブラウザでGitHubリポジトリを開きました")
+        return True
 
     def confirm_browser_check(self):
         """ブラウザでの確認を自動実行"""
         print("🌐 GitHubリポジトリをブラウザで自動確認します...")
         return self.open_github_repo_in_browser()
 
-    def check_branch_divergence(self):
+    def check_branch_divergence(self, snapshot=None):
         """ブランチの分岐状況をチェック"""
         print("🔍 ブランチの分岐状況をチェックしています...")
 
-        # git statusの詳細な出力を取得
-        result = self.run_command("git status --porcelain=v1 --branch")
-        if not result:
+        # ahead/behind は git status のスナップショットから整数で取得する
+        if snapshot is None:
+            snapshot = self.collect_repo_snapshot()
+        if not snapshot:
             return False
 
-        status_lines = result.stdout.strip().split("\n")
-        branch_info = status_lines[0] if status_lines else ""
+        ahead = snapshot["ahead"]
+        behind = snapshot["behind"]
 
         # ブランチの分岐を検出
-        if "ahead" in branch_info and "behind" in branch_info:
+        if ahead and behind:
             print("⚠️  ブランチが分岐しています！")
-            print(f"📊 状況: {branch_info}")
-
-            # 詳細な状況を表示
-            ahead_match = __import__("re").search(r"ahead (\d+)", branch_info)
-            behind_match = __import__("re").search(r"behind (\d+)", branch_info)
-
-            if ahead_match and behind_match:
-                ahead = ahead_match.group(1)
-                behind = behind_match.group(1)
-                print(f"📤 ローカルが {ahead} コミット先行")
-                print(f"📥 リモートが {behind} コミット先行")
-
+            print(
+                f"📊 状況: {snapshot['branch']}...{snapshot['upstream']} "
+                f"[ahead {ahead}, behind {behind}]"
+            )
+            print(f"📤 ローカルが {ahead} コミット先行")
+            print(f"📥 リモートが {behind} コミット先行")
+            return True
+        elif ahead:
+            print(f"✅ ローカルが {ahead} コミット先行（プッシュ可能）")
+        elif behind:
+            print(f"📥 リモートが {behind} コミット先行（プル必要）")
             return True
-        elif "ahead" in branch_info:
-            ahead_match = __import__("re").search(r"ahead (\d+)", branch_info)
-            if ahead_match:
-                ahead = ahead_match.group(1)
-                print(f"✅ ローカルが {ahead} コミット先行（プッシュ可能）")
-        elif "behind" in branch_info:
-            behind_match = __import__("re").search(r"behind (\d+)", branch_info)
-            if behind_match:
-                behind = behind_match.group(1)
-                print(f"📥 リモートが {behind} コミット先行（プル必要）")
-                return True
         else:
             print("✅ ブランチは同期されています")
 
@@ -1100,32 +1754,49 @@ class GitAutoPush:
         print("3. git push --force-with-lease (慎重: ローカルの変更を強制プッシュ)")
         print("4. スキップ (手動で解決)")
 
+        actions = {
+            "1": self.pull_rebase,
+            "2": self.pull_merge,
+            "3": self.confirm_force_push,
+            "4": self.skip_branch_divergence,
+        }
+        # 自動応答時は推奨の pull --rebase を選ぶ
+        return self.dispatch_choice("選択 (1/2/3/4): ", actions, "1")
+
+    def dispatch_choice(self, prompt, actions, auto_choice=""):
+        """選択肢の番号に対応する処理を実行（None が返った場合は選択し直す）"""
         while True:
-            choice = input("選択 (1/2/3/4): ").strip()
+            action = actions.get(self.ask(prompt, auto_choice))
+            if action is None:
+                print(f"{', '.join(actions)} のいずれかを選択してください")
+                continue
+            result = action()
+            if result is not None:
+                return result
+
+    def confirm_force_push(self):
+        """確認のうえ強制プッシュを実行（キャンセル時は None）"""
+        if self.confirm_action(
+            "⚠️  強制プッシュは危険です。リモートの変更が失われる可能性があります。続行しますか？",
+            dangerous=True,
+        ):
+            return self.force_push()
+        return None
 
-            if choice == "1":
-                return self.pull_rebase()
-            elif choice == "2":
-                return self.pull_merge()
-            elif choice == "3":
-                if self.confirm_action(
-                    "⚠️  強制プッシュは危険です。リモートの変更が失われる可能性があります。続行しますか？"
-                ):
-                    return self.force_push()
-                else:
-                    continue
-            elif choice == "4":
-                print("手動での解決を選択しました")
-                return True
-            else:
-                print("1, 2, 3, 4 のいずれかを選択してください")
+    def skip_branch_divergence(self):
+        """ブランチの分岐を手動で解決する"""
+        print("手動での解決を選択しました")
+        return True
 
     def pull_rebase(self):
         """git pull --rebase を実行"""
         print("🔄 git pull --rebase を実行中...")
-        result = self.run_command("git pull --rebase")
+        # リベースはコミットを作り直すため、コミット時と同じ作成者情報の補完が必要
+        identity_args = self.ensure_git_identity()
+        result = self.run_command(["git", *identity_args, "pull", "--rebase"])
         if result:
             print("✅ リベースが完了しました")
+            self.invalidate_git_cache()
             return True
         else:
             print("❌ リベースに失敗しました")
@@ -1137,9 +1808,13 @@ class GitAutoPush:
     def pull_merge(self):
         """git pull を実行"""
         print("🔄 git pull を実行中...")
-        result = self.run_command("git pull")
+        # マージコミットを作るため、コミット時と同じ作成者情報の補完が必要
+        identity_args = self.ensure_git_identity()
+        # --no-rebase で pull.rebase 未設定時の「分岐の解決方法を指定」エラーを避ける
+        result = self.run_command(["git", *identity_args, "pull", "--no-rebase"])
         if result:
             print("✅ マージが完了しました")
+            self.invalidate_git_cache()
             return True
         else:
             print("❌ マージに失敗しました")
@@ -1153,10 +1828,12 @@ class GitAutoPush:
         current_branch = self.get_current_branch()
         print(f"🚀 {current_branch} ブランチに強制プッシュ中...")
         result = self.run_command(
-            f"git push --force-with-lease origin {current_branch}"
+            ["git", "push", "--force-with-lease", "origin", current_branch],
+            capture=False,
         )
         if result:
             print("✅ 強制プッシュが完了しました")
+            self._snapshot = None  # upstream との ahead/behind が変わるため破棄
             return True
         else:
             print("❌ 強制プッシュに失敗しました")
@@ -1170,36 +1847,72 @@ class GitAutoPush:
         print("2. 手動で解決")
         print("3. マージを中止")
 
-        while True:
-            choice = input("選択 (1/2/3): ").strip()
+        actions = {
+            "1": self.resolve_conflict_in_vscode,
+            "2": self.resolve_conflict_manually,
+            "3": self.abort_merge,
+        }
+        # 自動応答時はコンフリクトを解決できないためマージを中止する
+        return self.dispatch_choice("選択 (1/2/3): ", actions, "3")
 
-            if choice == "1":
-                try:
-                    subprocess.run("code .", shell=True, cwd=self.repo_path)
-                    print("✅ VSCodeを開きました。コンフリクトを解決してください")
-                    input("コンフリクトを解決したら Enter キーを押してください...")
-                    return True
-                except Exception as e:
-                    print(f"❌ VSCodeの起動に失敗しました: {e}")
-                    continue
-            elif choice == "2":
-                print("手動でコンフリクトを解決してください")
-                input("コンフリクトを解決したら Enter キーを押してください...")
-                return True
-            elif choice == "3":
-                result = self.run_command("git merge --abort")
-                if result:
-                    print("✅ マージを中止しました")
-                else:
-                    print("❌ マージの中止に失敗しました")
-                return False
-            else:
-                print("1, 2, 3 のいずれかを選択してください")
+    def resolve_conflict_in_vscode(self):
+        """VSCodeでコンフリクトを解決（起動に失敗した場合は None）"""
+        try:
+            subprocess.run([_which("code") or "code", "."], cwd=self._cwd)
+        except Exception as e:
+            print(f"❌ VSCodeの起動に失敗しました: {e}")
+            return None
+        print("✅ VSCodeを開きました。コンフリクトを解決してください")
+        self.ask("コンフリクトを解決したら Enter キーを押してください...")
+        return True
+
+    def resolve_conflict_manually(self):
+        """手動でのコンフリクト解決を待つ"""
+        print("手動でコンフリクトを解決してください")
+        self.ask("コンフリクトを解決したら Enter キーを押してください...")
+        return True
 
-    def check_working_tree_clean(self):
+    def abort_merge(self):
+        """マージを中止"""
+        result = self.run_command(["git", "merge", "--abort"])
+        if result:
+            print("✅ マージを中止しました")
+        else:
+            print("❌ マージの中止に失敗しました")
+        return False
+
+    def is_pushed(self, snapshot, branch=None):
+        """ブランチが origin に対して先行コミットを持たないかをスナップショットから判定"""
+        if not snapshot or not snapshot["branch"]:
+            return False
+        if branch and branch != snapshot["branch"]:
+            return False  # 現在のブランチ以外は ahead 数が分からない
+        return (
+            snapshot["upstream"] == f"origin/{snapshot['branch']}"
+            and snapshot["ahead"] == 0
+        )
+
+    def display_changes(self, snapshot=None):
+        """変更されたファイルを表示"""
+        if snapshot is None:
+            snapshot = self.collect_repo_snapshot()
+        changes = snapshot["changes"] if snapshot else []
+        if not changes:
+            self.debug_print("✅ 変更されたファイルはありません")
+            return
+
+        print("\n📝 変更されたファイル:")
+        # 大量の変更がある場合は先頭のみ表示し、端末への出力で待たされないようにする
+        for line in changes[:_MAX_STATUS_LINES]:
+            print(f"  {line}")
+        if len(changes) > _MAX_STATUS_LINES:
+            print(f"  …ほか {len(changes) - _MAX_STATUS_LINES} 件")
+
+    def check_working_tree_clean(self, snapshot=None):
         """ワーキングツリーがクリーンかチェック"""
-        status = self.get_status()
-        if not status:
+        if snapshot is None:
+            snapshot = self.collect_repo_snapshot()
+        if not (snapshot and snapshot["changes"]):
             print("ℹ️  ワーキングツリーはクリーンです（変更なし）")
             return True
         return False
@@ -1227,6 +1940,19 @@ class GitAutoPush:
             self.print_execution_summary(execution_results)
             return False
 
+        # ロックファイルは git status が一時的に作るロックと区別するため先に確認する
+        git_locks = self.find_git_locks()
+
+        # git status は時間がかかるため、ディレクトリ分析や確認と並行して先に開始する
+        # コミット時に使うgit設定の読み込みも互いに独立しているため同時に行う
+        snapshot_future = None
+        config_future = None
+        if self.is_git_repo():
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+            snapshot_future = executor.submit(self.collect_repo_snapshot)
+            config_future = executor.submit(self.read_git_config)
+            executor.shutdown(wait=False)
+
         # 📊 初期ディレクトリ分析
         print("\n� 実行前のディレクトリ分析を開始...")
         initial_analysis = self.analyze_current_directory()
@@ -1235,7 +1961,7 @@ class GitAutoPush:
         # 分析結果に基づく警告表示
         if initial_analysis["warning_message"]:
             print(f"\n{initial_analysis['warning_message']}")
-            if not self.confirm_action("続行しますか？"):
+            if not self.confirm_action("続行しますか？", dangerous=True):
                 print("処理を中止しました")
                 self.print_execution_summary(execution_results)
                 return False
@@ -1247,17 +1973,21 @@ class GitAutoPush:
         self.debug_print(f"🔧 .gitパス: {self.git_path}")
         self.debug_print(f"✅ .gitパス存在チェック: {self.git_path.exists()}")
 
-        # Gitプロセスとロックファイルをチェック
-        if self.check_git_processes():
-            if not self.confirm_action(
-                "実行中のGitプロセスが見つかりました。続行しますか？"
-            ):
-                print("処理を中止しました")
-                self.print_execution_summary(execution_results)
-                return False
+        # ロックファイルがある場合のみ、Gitプロセスの確認とロックの処理を行う
+        if git_locks:
+            if self.check_git_processes():
+                if not self.confirm_action(
+                    "実行中のGitプロセスが見つかりました。続行しますか？",
+                    dangerous=True,
+                ):
+                    print("処理を中止しました")
+                    self.print_execution_summary(execution_results)
+                    return False
 
-        if self.check_git_locks():
-            print("ロックファイルの処理を完了しました")
+            if self.check_git_locks(git_locks):
+                print("ロックファイルの処理を完了しました")
+        else:
+            self.debug_print("✅ ロックファイルはありません")
 
         # Gitリポジトリかチェック
         if not self.is_git_repo():
@@ -1266,16 +1996,27 @@ class GitAutoPush:
                 print("処理を中止しました")
                 self.print_execution_summary(execution_results)
                 return False
-            if not self.init_git_repo():
+            if not self.init_git_repo(initial_analysis):
                 print("❌ エラー: Gitリポジトリの初期化に失敗しました")
                 self.print_execution_summary(execution_results)
                 return False
             execution_results["git_init"] = True
 
+        # git status は1回だけ取得し、以降のチェックと表示で共有する
+        if snapshot_future is not None:
+            snapshot = snapshot_future.result()
+            # 以降の read_git_config() が同じ git config を重複して実行しないよう待つ
+            config_future.result()
+        else:
+            snapshot = self.collect_repo_snapshot()  # git init 直後
+        self.prefetch_github_auth()
+
         # ブランチの分岐状況をチェック
-        if self.check_branch_divergence():
+        if self.check_branch_divergence(snapshot):
             if self.handle_branch_divergence():
                 execution_results["branch_sync"] = True
+                # プルで状態が変わるため取り直す
+                snapshot = self.collect_repo_snapshot()
             else:
                 print("❌ ブランチの分岐解決に失敗しました")
                 self.print_execution_summary(execution_results)
@@ -1284,23 +2025,23 @@ class GitAutoPush:
             execution_results["branch_sync"] = True
 
         # ステータスを表示
-        self.debug_print("📝 git statusを取得中...")
-        status_result = self.run_command("git status --porcelain -u")
-        if status_result and status_result.stdout.strip():
-            print("\n📝 変更されたファイル:")
-            for line in status_result.stdout.strip().split("\n"):
-                print(f"  {line}")
-        else:
-            self.debug_print("✅ 変更されたファイルはありません")
+        self.display_changes(snapshot)
 
         # ワーキングツリーがクリーンな場合の処理
-        if self.check_working_tree_clean():
+        if self.check_working_tree_clean(snapshot):
             print("✅ すべての変更は既にコミット済みです")
             execution_results["staging"] = True
             execution_results["commit"] = True
 
+            if self.no_push:
+                print("プッシュをスキップしました（--no-push）")
+                execution_results["push"] = True  # スキップも成功として扱う
+            # origin と同期済みならネットワーク接続を伴うプッシュを省く
+            elif not force and self.is_pushed(snapshot, branch):
+                print("✅ リモートと同期済みのため、プッシュは不要です")
+                execution_results["push"] = True
             # プッシュの確認
-            if self.confirm_action("最新の状態をリモートにプッシュしますか？"):
+            elif self.confirm_action("最新の状態をリモートにプッシュしますか？"):
                 if self.push(branch):
                     execution_results["push"] = True
                 else:
@@ -1311,20 +2052,13 @@ class GitAutoPush:
                 print("プッシュをスキップしました")
                 execution_results["push"] = True  # スキップも成功として扱う
 
-            # ブラウザでの確認
-            print("\n" + "=" * 50)
-            print("🎉 すべての操作が完了しました！")
-            print("=" * 50)
-
-            if self.confirm_browser_check():
-                execution_results["browser_open"] = True
-            else:
-                print("⚠️  ブラウザでの確認に失敗しました")
+            return self.finish_auto_push(execution_results)
 
-            # 実行結果サマリーを表示
-            self.print_execution_summary(execution_results)
-            print("🎉 自動プッシュ完了!")
-            return True
+        # ステージング・コミット・プッシュの確認を1回の入力にまとめる
+        if not self.assume_yes and self.confirm_action(
+            "ステージング・コミット・プッシュを個別に確認せずに実行しますか？"
+        ):
+            self._confirm_all = True
 
         # ステージングの確認
         if not self.confirm_action("変更をステージングしますか？"):
@@ -1332,12 +2066,24 @@ class GitAutoPush:
             self.print_execution_summary(execution_results)
             return False
 
+        # 状態は取り直さず、開始時に取得したスナップショットをそのまま使う
+        # （確認の入力待ちの間に作成された未追跡ファイルは対象にならない）
+
+        # 未追跡ファイルがなければ、ステージングはコミット時の -a でまとめて行う
+        # 取得に失敗した場合は git add . で全体をステージングする
+        stage_on_commit = snapshot is not None and not any(
+            line.startswith("??") for line in snapshot["changes"]
+        )
+
         # 変更をステージング
-        if not self.add_all():
+        if stage_on_commit:
+            print("📁 追跡中のファイルの変更はコミット時にステージングします")
+        elif not self.add_all(snapshot):
             print("❌ ステージングに失敗しました")
             self.print_execution_summary(execution_results)
             return False
-        execution_results["staging"] = True
+        else:
+            execution_results["staging"] = True
 
         # コミットの確認
         if not self.confirm_action("コミットしますか？"):
@@ -1346,90 +2092,182 @@ class GitAutoPush:
             return False
 
         # コミット
-        if not self.commit(message):
+        if not self.commit(message, stage_tracked=stage_on_commit):
             print("❌ コミットに失敗しました")
             self.print_execution_summary(execution_results)
             return False
+        execution_results["staging"] = True
         execution_results["commit"] = True
 
         # プッシュの確認とプッシュ
-        if not self.push(branch):
+        if self.no_push:
+            print("プッシュをスキップしました（--no-push）")
+        elif not self.push(branch):
             print("❌ プッシュに失敗しました")
             self.print_execution_summary(execution_results)
             return False
         execution_results["push"] = True
 
-        # ブラウザでの確認（必須）
-        print("\n" + "=" * 50)
-        print("🎉 すべての操作が完了しました！")
-        print("=" * 50)
+        return self.finish_auto_push(execution_results)
 
+    def finish_auto_push(self, execution_results):
+        """ブラウザでの確認を行い、サマリーを表示"""
+        # ブラウザでの確認（プッシュの完了後に行う）
         if self.confirm_browser_check():
             execution_results["browser_open"] = True
         else:
             print("⚠️  ブラウザでの確認に失敗しました")
 
+        print("\n" + "=" * 50)
+        print("🎉 すべての操作が完了しました！")
+        print("=" * 50)
+
         # 実行結果サマリーを表示
         self.print_execution_summary(execution_results)
-
         print("🎉 自動プッシュ完了!")
         return True
 
     def print_execution_summary(self, results):
         """実行結果のサマリーを表示"""
-        print("\n" + "=" * 60)
-        print("📊 実行結果サマリー")
-        print("=" * 60)
-
         status_icons = {True: "✅", False: "❌"}
 
-        print(
-            f"{status_icons[results['git_init']]} Git初期化: {'成功' if results['git_init'] else '未実行/失敗'}"
-        )
-        print(
-            f"{status_icons[results['branch_sync']]} ブランチ同期: {'成功' if results['branch_sync'] else '未実行/失敗'}"
-        )
-        print(
-            f"{status_icons[results['staging']]} ステージング: {'成功' if results['staging'] else '未実行/失敗'}"
-        )
-        print(
-            f"{status_icons[results['commit']]} コミット: {'成功' if results['commit'] else '未実行/失敗'}"
-        )
-        print(
-            f"{status_icons[results['push']]} プッシュ: {'成功' if results['push'] else '未実行/失敗'}"
-        )
-        print(
-            f"{status_icons[results['browser_open']]} ブラウザ確認: {'成功' if results['browser_open'] else '未実行/失敗'}"
-        )
-
         # 成功した項目の数を計算
         success_count = sum(1 for result in results.values() if result)
         total_count = len(results)
 
-        print(
+        # サマリー全体を組み立ててから1回で出力する
+        lines = ["", "=" * 60, "📊 実行結果サマリー", "=" * 60]
+        lines.extend(
+            f"{status_icons[results[key]]} {label}: "
+            f"{'成功' if results[key] else '未実行/失敗'}"
+            for key, label in _SUMMARY_STEPS
+        )
+        lines.append(
             f"\n🎯 成功率: {success_count}/{total_count} ({success_count/total_count*100:.1f}%)"
         )
-
         if success_count == total_count:
-            print("🎉 すべての操作が正常に完了しました！")
+            lines.append("🎉 すべての操作が正常に完了しました！")
         else:
-            print("⚠️  一部の操作が失敗しました。上記の結果を確認してください。")
-
-        print("=" * 60)
+            lines.append("⚠️  一部の操作が失敗しました。上記の結果を確認してください。")
+        lines.append("=" * 60)
+        print("\n".join(lines))
+
+
+def _auto_push_worker(job, options):
+    """1つのリポジトリを処理する（複数リポジトリ指定時に子プロセスで実行）"""
+    index, repo = job
+    # 同じファイルに複数のプロセスが書き込まないよう、リポジトリごとにログを分ける
+    log_file = f"git-auto-push_{options['timestamp']}_{index}_{Path(repo).name}.log"
+    try:
+        # 子プロセスは標準入力を共有できないため、確認は自動応答（--yes 指定時のみ）
+        auto_push = GitAutoPush(
+            repo,
+            debug=options["debug"],
+            log_file=log_file,
+            assume_yes=True,
+            no_push=options["no_push"],
+            force_unlock=options["force_unlock"],
+            visibility=options["visibility"],
+            description=options["description"],
+        )
+        success = auto_push.auto_push(
+            message=options["message"],
+            branch=options["branch"],
+            force=options["force"],
+        )
+    except Exception as e:
+        print(f"❌ {repo}: {e}")
+        success = False
+    finally:
+        # プールの子プロセスは atexit を実行せずに終了するため、ここでログを書き出す
+        GitAutoPush.stop_logging()
+    return repo, success
+
+
+def _auto_push_all(repos, options):
+    """複数のリポジトリを並列に処理し、すべて成功したかを返す"""
+    # 複数リポジトリ指定時にしか使わないため、ここでインポートする
+    import multiprocessing
+
+    results = {}
+    options = {**options, "timestamp": time.strftime("%Y%m%d_%H%M%S")}
+    processes = min(len(repos), os.cpu_count() or 1)
+    # リポジトリごとに新しいプロセスを使い、キャッシュやログ設定を持ち越さない
+    with multiprocessing.Pool(processes, maxtasksperchild=1) as pool:
+        worker = functools.partial(_auto_push_worker, options=options)
+        jobs = enumerate(repos, 1)
+        for repo, success in pool.imap_unordered(worker, jobs, chunksize=1):
+            results[repo] = success
+
+    print("\n" + "=" * 60)
+    print("📊 リポジトリ別の実行結果")
+    print("=" * 60)
+    print("\n".join(f"{'✅' if results[repo] else '❌'} {repo}" for repo in repos))
+    print("=" * 60)
+    return all(results.values())
 
 
 def main():
     parser = argparse.ArgumentParser(description="GIT Auto Push Script")
-    parser.add_argument("repo", help="リポジトリパス（必須）")
+    parser.add_argument(
+        "repo",
+        nargs="+",
+        help="リポジトリパス（必須、複数指定すると並列に処理する。その場合は --yes が必要）",
+    )
     parser.add_argument("--message", "-m", help="コミットメッセージ")
     parser.add_argument("--branch", "-b", help="プッシュするブランチ")
     parser.add_argument("--force", "-f", action="store_true", help="強制プッシュ")
     parser.add_argument("--debug", "-d", action="store_true", help="デバッグモード")
+    parser.add_argument(
+        "--yes",
+        "-y",
+        action="store_true",
+        help="確認を入力待ちせずに自動応答する（危険な操作は「いいえ」）",
+    )
+    parser.add_argument(
+        "--no-push", action="store_true", help="コミットまで行いプッシュしない"
+    )
+    parser.add_argument(
+        "--force-unlock",
+        action="store_true",
+        help="古いGitロックファイルを確認なしで削除する",
+    )
+    parser.add_argument(
+        "--visibility",
+        choices=["public", "private"],
+        help="GitHubリポジトリを作成する場合の可視性",
+    )
+    parser.add_argument("--description", help="GitHubリポジトリを作成する場合の説明")
 
     args = parser.parse_args()
 
+    if len(args.repo) > 1:
+        # 並列処理中は入力を受け付けられないため、自動応答を明示的に指定させる
+        # （git init やGitHubリポジトリ作成も確認なしで行われるため）
+        if not args.yes:
+            parser.error("複数のリポジトリを指定する場合は --yes も指定してください")
+        options = {
+            "message": args.message,
+            "branch": args.branch,
+            "force": args.force,
+            "debug": args.debug,
+            "no_push": args.no_push,
+            "force_unlock": args.force_unlock,
+            "visibility": args.visibility,
+            "description": args.description,
+        }
+        sys.exit(0 if _auto_push_all(args.repo, options) else 1)
+
     # 自動プッシュ実行
-    auto_push = GitAutoPush(args.repo, debug=args.debug)
+    auto_push = GitAutoPush(
+        args.repo[0],
+        debug=args.debug,
+        assume_yes=args.yes,
+        no_push=args.no_push,
+        force_unlock=args.force_unlock,
+        visibility=args.visibility,
+        description=args.description,
+    )
     success = auto_push.auto_push(
         message=args.message, branch=args.branch, force=args.force
     )